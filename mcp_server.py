@@ -585,6 +585,17 @@ class AIMCPServerApp(MCPServer):
         })
 
 
+def port_number(value: str) -> int:
+    """Parse a --port argument, rejecting values outside 1-65535"""
+    try:
+        port = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid port: {value!r}")
+    if not 0 < port < 65536:
+        raise argparse.ArgumentTypeError(f"port must be between 1 and 65535, got {port}")
+    return port
+
+
 async def main():
     """Main entry point"""
     parser = argparse.ArgumentParser(description='AI MCP Server with JSON-RPC')
@@ -597,7 +608,7 @@ async def main():
     transport_type.add_argument('--websocket', action='store_true',
                               help='Run as WebSocket server (can also set MCP_TRANSPORT_TYPE=websocket in .env)')
     transport_group.add_argument('--host', help='Host to bind server (can also set MCP_TCP_HOST in .env)')
-    transport_group.add_argument('--port', type=int, help='Port for server (can also set MCP_TCP_PORT for TCP or MCP_WS_PORT for WebSocket)')
+    transport_group.add_argument('--port', type=port_number, help='Port for server (can also set MCP_TCP_PORT for TCP or MCP_WS_PORT for WebSocket)')
     transport_group.add_argument('--ws-path', help='URL path for WebSocket server (default: /)')
     
     # AI service options
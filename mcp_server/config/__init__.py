@@ -1,6 +1,7 @@
 """Configuration helpers for MCP Server."""
 
+from .env_file import load_env_file
 from .settings import MCPServerConfig
 
-__all__ = ["MCPServerConfig"]
+__all__ = ["MCPServerConfig", "load_env_file"]
 
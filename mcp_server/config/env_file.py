@@ -0,0 +1,52 @@
+"""
+Loading of the project .env file
+
+Kept free of other project imports so both the settings module and the
+secrets manager can load the file without importing each other.
+"""
+
+import os
+import logging
+from pathlib import Path
+
+logger = logging.getLogger("mcp_server.config")
+
+# Project .env file; only resolved (symlinks followed) when it actually exists
+_ENV_PATH = Path(__file__).parent.parent.parent / '.env'
+if _ENV_PATH.exists():
+    _ENV_PATH = _ENV_PATH.resolve()
+
+_dotenv_loaded = False
+
+
+def load_env_file() -> None:
+    """Load the project ``.env`` file into the environment (once per process).
+
+    Does nothing if ``MCP_SKIP_DOTENV`` is set or the file does not exist.
+    Called automatically the first time a configuration or the secrets
+    manager is built, so importing this module stays cheap.
+    """
+    global _dotenv_loaded
+    if _dotenv_loaded:
+        return
+    _dotenv_loaded = True
+
+    # Skip parsing entirely when the environment is injected by the
+    # orchestrator (MCP_SKIP_DOTENV set) or there is no .env file
+    if os.environ.get("MCP_SKIP_DOTENV"):
+        logger.debug("MCP_SKIP_DOTENV is set, not loading .env file")
+        return
+    if not _ENV_PATH.is_file():
+        logger.debug("No .env file at %s", _ENV_PATH)
+        return
+
+    # Import dotenv for .env file support
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        logger.warning("python-dotenv not installed. Environment variables will only be loaded from system environment.")
+        return
+
+    # Existing environment variables always win over the file
+    load_dotenv(dotenv_path=_ENV_PATH, override=False)
+    logger.info("Loaded environment variables from %s", _ENV_PATH)
@@ -6,47 +6,155 @@ Loads configuration from .env file and environment variables.
 """
 
 import os
+import math
 import logging
-from pathlib import Path
-from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from collections import ChainMap
+from dataclasses import InitVar, dataclass, field, fields
+from functools import cached_property
+from types import MappingProxyType
+from typing import Optional, Dict, Any, Mapping, Tuple, Callable, ClassVar
 
+from mcp_server.config.env_file import load_env_file
 from mcp_server.services.secrets_manager import get_secrets_manager
 
-# Import dotenv for .env file support
-try:
-    from dotenv import load_dotenv
-    # Try to load from .env file
-    env_path = Path(__file__).resolve().parents[2] / '.env'
-    load_dotenv(dotenv_path=env_path)
-    logging.info(f"Loaded environment variables from {env_path}")
-except ImportError:
-    logging.warning("python-dotenv not installed. Environment variables will only be loaded from system environment.")
-    pass
+logger = logging.getLogger("mcp_server.config")
 
+# Shared, immutable defaults for the sequence-valued settings
+_DEFAULT_TRANSPORT_TYPES = ("stdio",)
 
-@dataclass
+_DEFAULT_CLAUDE_MODELS = (
+    "claude-3-opus-20240229",
+    "claude-3-sonnet-20240229",
+    "claude-3-haiku-20240307",
+)
+
+_DEFAULT_OPENAI_MODELS = (
+    "gpt-4o",
+    "gpt-4-turbo",
+    "gpt-4",
+    "gpt-3.5-turbo",
+)
+
+_DEFAULT_EMBEDDING_MODELS = (
+    "text-embedding-3-small",
+    "text-embedding-3-large",
+)
+
+# Sequence-valued settings and their defaults (ws_origins has none)
+_DEFAULT_SEQUENCES = (
+    ("transport_types", _DEFAULT_TRANSPORT_TYPES),
+    ("ws_origins", None),
+    ("claude_models", _DEFAULT_CLAUDE_MODELS),
+    ("openai_models", _DEFAULT_OPENAI_MODELS),
+    ("embedding_models", _DEFAULT_EMBEDDING_MODELS),
+)
+
+
+def _csv(value: Any) -> Optional[Tuple[str, ...]]:
+    """Split a comma-separated setting (or a sequence) into a tuple, dropping empty items.
+
+    Returns None if nothing is left or the value is not text, so the
+    default is kept.
+    """
+    if isinstance(value, str):
+        parts = value.split(",")
+    elif isinstance(value, (list, tuple)) and all(isinstance(part, str) for part in value):
+        parts = value
+    else:
+        return None
+    return tuple(item for item in (part.strip() for part in parts) if item) or None
+
+
+def _safe_int(value: Any, default: Optional[int] = None) -> Optional[int]:
+    """Parse an integer setting, returning ``default`` if it is malformed."""
+    if isinstance(value, bool):
+        return default
+    if isinstance(value, int):
+        return value
+    if not isinstance(value, str):
+        return default
+    value = value.strip()
+    digits = value[1:] if value[:1] in ("+", "-") else value
+    if digits.isdecimal():
+        return int(value)
+    # Rarer forms int() also accepts, such as "1_000"
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+def _safe_float(value: Any, default: Optional[float] = None) -> Optional[float]:
+    """Parse a float setting, returning ``default`` if it is malformed."""
+    if isinstance(value, bool):
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _port(value: Any) -> Optional[int]:
+    """Parse a TCP port, rejecting values outside 1-65535."""
+    port = _safe_int(value)
+    return port if port is not None and 0 < port < 65536 else None
+
+
+def _positive_int(value: Any) -> Optional[int]:
+    """Parse a strictly positive integer setting."""
+    number = _safe_int(value)
+    return number if number is not None and number > 0 else None
+
+
+def _non_negative_float(value: Any) -> Optional[float]:
+    """Parse a finite float setting that must not be negative."""
+    number = _safe_float(value)
+    return number if number is not None and math.isfinite(number) and number >= 0 else None
+
+
+# Secret-backed settings as (attribute, secret name) pairs
+_SECRET_ATTRS = (
+    ("anthropic_api_key", "ANTHROPIC_API_KEY"),
+    ("openai_api_key", "OPENAI_API_KEY"),
+    ("embeddings_3_large_api_key", "EMBEDDINGS_3_LARGE_API_KEY"),
+    ("embeddings_3_small_api_key", "EMBEDDINGS_3_SMALL_API_KEY"),
+    ("qdrant_url", "QDRANT_URL"),
+    ("qdrant_api_key", "QDRANT_API_KEY"),
+)
+
+_SECRET_KEYS = tuple(key for _, key in _SECRET_ATTRS)
+
+
+def _secret_property(key: str) -> cached_property:
+    """Build a property that resolves ``key`` on first access."""
+    def fetch(self) -> Optional[str]:
+        return self._secret_values[key]
+    fetch.__doc__ = f"Secret ``{key}`` (resolved lazily)"
+    return cached_property(fetch)
+
+
+@dataclass(frozen=True)
 class MCPServerConfig:
-    """Configuration for the MCP Server"""
+    """Configuration for the MCP Server (immutable once built)"""
     # Server info
     name: str = "ai-mcp-server"
     version: str = "1.0.0"
     description: str = "MCP Server with multiple AI model integration"
     
     # Transport settings
-    transport_types: list = None  # List of transports: ['stdio', 'tcp', 'websocket']
+    transport_types: Tuple[str, ...] = _DEFAULT_TRANSPORT_TYPES  # ('stdio', 'tcp', 'websocket')
     tcp_host: str = "127.0.0.1"
     tcp_port: int = 9000
     ws_port: int = 8765
     ws_path: str = "/"
-    ws_origins: Optional[list] = None
+    ws_origins: Optional[Tuple[str, ...]] = None
     
     # AI service type
     ai_service_type: str = "claude"  # 'claude', 'openai', or 'mock'
     
-    # API keys
-    anthropic_api_key: Optional[str] = None
-    openai_api_key: Optional[str] = None
+    # API keys; when not given they are resolved lazily (see below)
+    anthropic_api_key: InitVar[Optional[str]] = None
+    openai_api_key: InitVar[Optional[str]] = None
     
     # Claude API settings
     claude_default_model: str = "claude-3-opus-20240229"
@@ -63,188 +171,260 @@ class MCPServerConfig:
     
     # Azure OpenAI Embedding settings
     embeddings_3_large_api_url: Optional[str] = None
-    embeddings_3_large_api_key: Optional[str] = None
+    embeddings_3_large_api_key: InitVar[Optional[str]] = None
     
     embeddings_3_small_api_url: Optional[str] = None
-    embeddings_3_small_api_key: Optional[str] = None
+    embeddings_3_small_api_key: InitVar[Optional[str]] = None
 
     azure_openai_embedding_deployment: Optional[str] = None
 
     # Vector store settings
-    qdrant_url: Optional[str] = None
-    qdrant_api_key: Optional[str] = None
-    
+    qdrant_url: InitVar[Optional[str]] = None
+    qdrant_api_key: InitVar[Optional[str]] = None
+
     # Available models
-    claude_models: list = None
-    openai_models: list = None
-    embedding_models: list = None
+    claude_models: Tuple[str, ...] = _DEFAULT_CLAUDE_MODELS
+    openai_models: Tuple[str, ...] = _DEFAULT_OPENAI_MODELS
+    embedding_models: Tuple[str, ...] = _DEFAULT_EMBEDDING_MODELS
     
-    def __post_init__(self):
-        # Set default models if not provided
-        if self.claude_models is None:
-            self.claude_models = [
-                "claude-3-opus-20240229",
-                "claude-3-sonnet-20240229",
-                "claude-3-haiku-20240307"
-            ]
+    # API keys given to the constructor as (attribute, value) pairs, so they
+    # take part in equality and hashing like the other settings
+    _explicit_secrets: Tuple[Tuple[str, str], ...] = field(default=(), init=False, repr=False)
+    
+    def __post_init__(
+        self,
+        anthropic_api_key: Optional[str],
+        openai_api_key: Optional[str],
+        embeddings_3_large_api_key: Optional[str],
+        embeddings_3_small_api_key: Optional[str],
+        qdrant_url: Optional[str],
+        qdrant_api_key: Optional[str],
+    ):
+        # API keys passed to the constructor are stored as the already-resolved
+        # values of their lazy properties, so the secrets manager is skipped
+        given = (
+            anthropic_api_key,
+            openai_api_key,
+            embeddings_3_large_api_key,
+            embeddings_3_small_api_key,
+            qdrant_url,
+            qdrant_api_key,
+        )
+        explicit = tuple(
+            (attr, value) for (attr, _), value in zip(_SECRET_ATTRS, given) if value is not None
+        )
+        self.__dict__.update(explicit)
+        object.__setattr__(self, "_explicit_secrets", explicit)
         
-        if self.openai_models is None:
-            self.openai_models = [
-                "gpt-4o",
-                "gpt-4-turbo",
-                "gpt-4",
-                "gpt-3.5-turbo"
-            ]
-            
-        if self.embedding_models is None:
-            self.embedding_models = [
-                "text-embedding-3-small",
-                "text-embedding-3-large"
-            ]
-            
-        # Set default transport types if not provided
-        if self.transport_types is None:
-            self.transport_types = ["stdio"]
+        # Fall back to the shared defaults and store any given sequences as
+        # tuples (a lone string is one item, not a sequence of characters);
+        # the dataclass is frozen, so this goes through object.__setattr__
+        for name, default in _DEFAULT_SEQUENCES:
+            value = getattr(self, name)
+            if value is None:
+                object.__setattr__(self, name, default)
+            elif isinstance(value, str):
+                object.__setattr__(self, name, (value,))
+            elif not isinstance(value, tuple):
+                object.__setattr__(self, name, tuple(value))
+    
+    @cached_property
+    def _secret_values(self) -> Dict[str, Any]:
+        """All secret-backed settings, fetched with a single get_many call"""
+        return get_secrets_manager().get_many(_SECRET_KEYS)
+    
+    # Environment variable -> (attribute, coercer) table used by from_env;
+    # coercers parse and validate (strings or already-typed values),
+    # returning None for values to be ignored
+    _ENV_FIELDS: ClassVar[Tuple[Tuple[str, str, Callable[[Any], Any]], ...]] = (
+        ("MCP_SERVER_NAME", "name", str),
+        ("MCP_SERVER_VERSION", "version", str),
+        ("MCP_TRANSPORT_TYPE", "transport_types", _csv),
+        ("MCP_TCP_HOST", "tcp_host", str),
+        ("MCP_TCP_PORT", "tcp_port", _port),
+        ("MCP_WS_PORT", "ws_port", _port),
+        ("MCP_WS_PATH", "ws_path", str),
+        ("MCP_WS_ORIGINS", "ws_origins", _csv),
+        ("AI_SERVICE_TYPE", "ai_service_type", str),
+        ("CLAUDE_DEFAULT_MODEL", "claude_default_model", str),
+        ("CLAUDE_DEFAULT_MAX_TOKENS", "claude_default_max_tokens", _positive_int),
+        ("CLAUDE_DEFAULT_TEMPERATURE", "claude_default_temperature", _non_negative_float),
+        ("OPENAI_DEFAULT_MODEL", "openai_default_model", str),
+        ("OPENAI_DEFAULT_MAX_TOKENS", "openai_default_max_tokens", _positive_int),
+        ("OPENAI_DEFAULT_TEMPERATURE", "openai_default_temperature", _non_negative_float),
+        ("EMBEDDING_MODEL", "embedding_model", str),
+        ("EMBEDDINGS_3_LARGE_API_URL", "embeddings_3_large_api_url", str),
+        ("EMBEDDINGS_3_SMALL_API_URL", "embeddings_3_small_api_url", str),
+        ("AZURE_OPENAI_EMBEDDING_DEPLOYMENT", "azure_openai_embedding_deployment", str),
+    )
     
     @classmethod
     def from_env(cls) -> "MCPServerConfig":
-        """Create a configuration from environment variables"""
-        config = cls()
-        secrets = get_secrets_manager()
-        
-        # Load environment variables if they exist
-        if os.environ.get("MCP_SERVER_NAME"):
-            config.name = os.environ.get("MCP_SERVER_NAME")
-            
-        if os.environ.get("MCP_SERVER_VERSION"):
-            config.version = os.environ.get("MCP_SERVER_VERSION")
-            
-        if os.environ.get("MCP_TRANSPORT_TYPE"):
-            transport_types = os.environ.get("MCP_TRANSPORT_TYPE").split(",")
-            config.transport_types = [t.strip() for t in transport_types]
-            
-        if os.environ.get("MCP_TCP_HOST"):
-            config.tcp_host = os.environ.get("MCP_TCP_HOST")
-            
-        if os.environ.get("MCP_TCP_PORT"):
-            try:
-                config.tcp_port = int(os.environ.get("MCP_TCP_PORT"))
-            except ValueError:
-                pass
-        
-        # WebSocket settings
-        if os.environ.get("MCP_WS_PORT"):
-            try:
-                config.ws_port = int(os.environ.get("MCP_WS_PORT"))
-            except ValueError:
-                pass
-            
-        if os.environ.get("MCP_WS_PATH"):
-            config.ws_path = os.environ.get("MCP_WS_PATH")
-            
-        if os.environ.get("MCP_WS_ORIGINS"):
-            try:
-                origins = os.environ.get("MCP_WS_ORIGINS")
-                config.ws_origins = origins.split(",")
-            except Exception:
-                pass
-        
-        # AI service type
-        if os.environ.get("AI_SERVICE_TYPE"):
-            config.ai_service_type = os.environ.get("AI_SERVICE_TYPE")
-            
-        # API keys (use secrets manager for optional rotation)
-        config.anthropic_api_key = secrets.get("ANTHROPIC_API_KEY")
-        config.openai_api_key = secrets.get("OPENAI_API_KEY")
-        
-        # Claude settings
-        if os.environ.get("CLAUDE_DEFAULT_MODEL"):
-            config.claude_default_model = os.environ.get("CLAUDE_DEFAULT_MODEL")
-            
-        if os.environ.get("CLAUDE_DEFAULT_MAX_TOKENS"):
-            try:
-                config.claude_default_max_tokens = int(os.environ.get("CLAUDE_DEFAULT_MAX_TOKENS"))
-            except ValueError:
-                pass
-            
-        if os.environ.get("CLAUDE_DEFAULT_TEMPERATURE"):
-            try:
-                config.claude_default_temperature = float(os.environ.get("CLAUDE_DEFAULT_TEMPERATURE"))
-            except ValueError:
-                pass
-        
-        # OpenAI settings
-        if os.environ.get("OPENAI_DEFAULT_MODEL"):
-            config.openai_default_model = os.environ.get("OPENAI_DEFAULT_MODEL")
-            
-        if os.environ.get("OPENAI_DEFAULT_MAX_TOKENS"):
-            try:
-                config.openai_default_max_tokens = int(os.environ.get("OPENAI_DEFAULT_MAX_TOKENS"))
-            except ValueError:
-                pass
-            
-        if os.environ.get("OPENAI_DEFAULT_TEMPERATURE"):
-            try:
-                config.openai_default_temperature = float(os.environ.get("OPENAI_DEFAULT_TEMPERATURE"))
-            except ValueError:
-                pass
-        
-        # Embedding settings
-        if os.environ.get("EMBEDDING_MODEL"):
-            config.embedding_model = os.environ.get("EMBEDDING_MODEL")
-            
-        # Azure OpenAI Embedding settings
-        config.embeddings_3_large_api_url = os.environ.get("EMBEDDINGS_3_LARGE_API_URL")
-        config.embeddings_3_large_api_key = secrets.get("EMBEDDINGS_3_LARGE_API_KEY")
+        """Get the configuration built from environment variables.
 
-        config.embeddings_3_small_api_url = os.environ.get("EMBEDDINGS_3_SMALL_API_URL")
-        config.embeddings_3_small_api_key = secrets.get("EMBEDDINGS_3_SMALL_API_KEY")
+        The configuration is built once per process and cached; use
+        :func:`reset_config` to force a rebuild.
+        """
+        global _config
+        if _config is None:
+            # The environment values are already keyed by field name, so the
+            # config is constructed directly without an intermediate ChainMap
+            _config = cls(**cls._env_values())
+        return _config
 
-        config.qdrant_url = secrets.get("QDRANT_URL")
-        config.qdrant_api_key = secrets.get("QDRANT_API_KEY")
+    @classmethod
+    def from_sources(cls, args: Dict[str, Any]) -> "MCPServerConfig":
+        """Create a configuration from explicit values layered over the environment.
+
+        ``args`` maps constructor argument names (fields and API key
+        parameters) to values. Missing or None entries fall through to the
+        environment and then to the dataclass defaults.
+
+        Raises:
+            TypeError: If ``args`` contains a name the constructor does not accept.
+            ValueError: If a value fails validation.
+        """
+        unknown = set(args) - set(_INIT_NAMES)
+        if unknown:
+            raise TypeError(f"Unknown configuration keys: {', '.join(sorted(unknown))}")
+        overrides = {key: value for key, value in args.items() if value is not None}
+        return cls._merge(_validated(overrides), cls._env_values())
+
+    @classmethod
+    def _env_values(cls) -> Mapping[str, Any]:
+        """Get the typed field values set in the environment.
 
-        config.azure_openai_embedding_deployment = os.environ.get("AZURE_OPENAI_EMBEDDING_DEPLOYMENT")
+        The environment is read once and the (read-only) result shared by
+        from_env, from_args and from_sources until :func:`reset_config`.
+        """
+        global _env_cache
+        if _env_cache is not None:
+            return _env_cache
         
-        return config
+        load_env_file()
+        # Plain dict snapshot, so lookups below skip the os._Environ key encoding
+        env = os.environ.copy()
+        values = {}
+        
+        for key, attr, coerce in cls._ENV_FIELDS:
+            raw = env.get(key)
+            if not raw:
+                continue
+            value = coerce(raw)
+            if value is None:
+                logger.warning("Ignoring invalid value %r for %s, using the default", raw, key)
+                continue
+            values[attr] = value
+        
+        _env_cache = MappingProxyType(values)
+        return _env_cache
+
+    @classmethod
+    def _merge(cls, *layers: Mapping[str, Any]) -> "MCPServerConfig":
+        """Build a configuration resolving each field from the first layer that has it"""
+        merged = ChainMap(*layers)
+        return cls(**{name: merged[name] for name in _INIT_NAMES if name in merged})
     
     @classmethod
     def from_args(cls, args: Dict[str, Any]) -> "MCPServerConfig":
-        """Create a configuration from command line arguments"""
-        config = cls.from_env()  # Start with environment variables
+        """Create a configuration from command line arguments
+
+        Raises:
+            ValueError: If an argument fails validation.
+        """
+        # Command line arguments take precedence over environment variables
+        env_values = cls._env_values()
+        overrides: Dict[str, Any] = {}
         
         # Override with command line arguments if provided
-        if args.get("name"):
-            config.name = args.get("name")
+        if value := args.get("name"):
+            overrides["name"] = value
             
-        if args.get("tcp") and "tcp" not in config.transport_types:
-            config.transport_types.append("tcp")
+        # Ordered set of transports, so repeated flags never duplicate an entry
+        transport_types = dict.fromkeys(
+            env_values.get("transport_types", _DEFAULT_TRANSPORT_TYPES)
+        )
+        if args.get("tcp"):
+            transport_types["tcp"] = None
             
-        if args.get("websocket") and "websocket" not in config.transport_types:
-            config.transport_types.append("websocket")
+        if args.get("websocket"):
+            transport_types["websocket"] = None
+        overrides["transport_types"] = tuple(transport_types)
             
-        if args.get("host"):
-            config.tcp_host = args.get("host")
+        if value := args.get("host"):
+            overrides["tcp_host"] = value
             
-        if args.get("port"):
-            config.tcp_port = args.get("port")
+        if value := args.get("port"):
+            overrides["tcp_port"] = value
             
         # AI service type
         if args.get("mock"):
-            config.ai_service_type = "mock"
-        elif args.get("service_type"):
-            config.ai_service_type = args.get("service_type")
+            overrides["ai_service_type"] = "mock"
+        elif value := args.get("service_type"):
+            overrides["ai_service_type"] = value
             
         # API keys
-        if args.get("claude_api_key"):
-            config.anthropic_api_key = args.get("claude_api_key")
+        if value := args.get("claude_api_key"):
+            overrides["anthropic_api_key"] = value
             
-        if args.get("openai_api_key"):
-            config.openai_api_key = args.get("openai_api_key")
+        if value := args.get("openai_api_key"):
+            overrides["openai_api_key"] = value
+
+        if value := args.get("qdrant_url"):
+            overrides["qdrant_url"] = value
+
+        if value := args.get("qdrant_api_key"):
+            overrides["qdrant_api_key"] = value
+
+        return cls._merge(_validated(overrides), env_values)
+
+
+# Attach the lazy API key properties after the class is built, so they
+# replace the InitVar defaults (see _secret_property)
+for _attr, _key in _SECRET_ATTRS:
+    _prop = _secret_property(_key)
+    _prop.__set_name__(MCPServerConfig, _attr)
+    setattr(MCPServerConfig, _attr, _prop)
+del _attr, _key, _prop
+
+# Constructor argument names (dataclass fields plus the API key InitVars),
+# computed once rather than on every merge
+_INIT_NAMES = (
+    tuple(f.name for f in fields(MCPServerConfig) if f.init)
+    + tuple(attr for attr, _ in _SECRET_ATTRS)
+)
+
+# Attribute -> coercer, so explicit values pass the same checks as the environment
+_COERCERS = {attr: coerce for _, attr, coerce in MCPServerConfig._ENV_FIELDS}
+
+
+def _validated(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Run explicit values through the field coercers.
+
+    Unlike the environment, explicit values are not silently replaced by
+    the defaults.
+
+    Raises:
+        ValueError: If a value fails its field's checks.
+    """
+    checked = {}
+    for attr, value in values.items():
+        coerce = _COERCERS.get(attr)
+        if coerce is not None:
+            coerced = coerce(value)
+            if coerced is None:
+                raise ValueError(f"Invalid value {value!r} for {attr}")
+            value = coerced
+        checked[attr] = value
+    return checked
+
 
-        if args.get("qdrant_url"):
-            config.qdrant_url = args.get("qdrant_url")
+_config: Optional[MCPServerConfig] = None
+_env_cache: Optional[Mapping[str, Any]] = None
 
-        if args.get("qdrant_api_key"):
-            config.qdrant_api_key = args.get("qdrant_api_key")
 
-        return config
+def reset_config() -> None:
+    """Drop the cached environment values and configuration (mainly for tests)."""
+    global _config, _env_cache
+    _config = None
+    _env_cache = None
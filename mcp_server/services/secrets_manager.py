@@ -1,7 +1,9 @@
 import os
 import json
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
+
+from mcp_server.config.env_file import load_env_file
 
 class SecretsManager:
     """Simple secrets manager that loads secrets from a JSON file or environment."""
@@ -36,10 +38,25 @@ class SecretsManager:
             return current
         return value
 
+    def get_many(self, keys: Iterable[str], default: Any = None) -> Dict[str, Any]:
+        """Retrieve several secrets at once.
+
+        Returns a mapping of each key to its value (or ``default``). Backends
+        that talk to a remote store can override this to fetch all keys in a
+        single round-trip.
+        """
+        return {key: self.get(key, default) for key in keys}
+
 _manager: Optional[SecretsManager] = None
 
 def get_secrets_manager() -> SecretsManager:
-    """Get a global :class:`SecretsManager` instance."""
+    """Get a global :class:`SecretsManager` instance.
+
+    Loads the project ``.env`` file first, so ``SECRETS_FILE`` and any
+    secrets defined there are visible even if no configuration was built.
+    """
+    load_env_file()
+
     global _manager
     if _manager is None:
         file_path = os.environ.get("SECRETS_FILE")
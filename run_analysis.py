@@ -13,6 +13,7 @@ import datetime
 import json
 import time
 
+from mcp_server.config import load_env_file
 from mcp_server.services.mongodb_service import MongoDBService
 from mcp_server.services.embedding_service import EmbeddingService
 from mcp_server.services.vector_store.qdrant_service import QdrantVectorService
@@ -166,6 +167,9 @@ async def search_code(repo_id, query, search_type="all", limit=10):
 
 async def main():
     """Main entry point"""
+    # Pick up the project .env before reading defaults from the environment
+    load_env_file()
+
     parser = argparse.ArgumentParser(description="Analyze a repository and build documentation")
     parser.add_argument("--repo-path", "--repo", dest="repo_path", default=os.environ.get("REPO_PATH"),
                         help="Path to the repository to analyze")
@@ -7,12 +7,16 @@ import os
 import asyncio
 import json
 
+from mcp_server.config import load_env_file
 from mcp_server.services.knowledge_extraction.environment_analyzer import EnvironmentAnalyzer
 from mcp_server.services.knowledge_extraction.pattern_extractor import PatternExtractor
 from mcp_server.services.knowledge_extraction.code_extractor import CodeExtractor
 from mcp_server.services.knowledge_extraction.md_builder import MarkdownBuilder
 
 async def main():
+    # Pick up the project .env before reading defaults from the environment
+    load_env_file()
+
     parser = argparse.ArgumentParser(description="Run knowledge extraction tests")
     parser.add_argument("--repo-path", "--repo", dest="repo_path", default=os.environ.get("REPO_PATH"),
                         help="Path to the repository to analyze")
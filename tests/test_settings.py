@@ -0,0 +1,278 @@
+"""
+Tests for the server configuration loader.
+"""
+import dataclasses
+import os
+
+import pytest
+
+from mcp_server.config import env_file
+from mcp_server.config.env_file import load_env_file
+from mcp_server.config.settings import MCPServerConfig, reset_config
+
+
+@pytest.fixture(autouse=True)
+def fresh_config(monkeypatch):
+    """Make sure every test builds its configuration from a clean environment."""
+    # Never read the developer's .env file, and drop any inherited settings
+    monkeypatch.setattr(env_file, "_dotenv_loaded", True)
+    monkeypatch.delenv("MCP_SKIP_DOTENV", raising=False)
+    for key, _, _ in MCPServerConfig._ENV_FIELDS:
+        monkeypatch.delenv(key, raising=False)
+
+    reset_config()
+    yield
+    reset_config()
+
+
+@pytest.fixture
+def dotenv_file(tmp_path, monkeypatch):
+    """Point the loader at a temporary .env file that has not been loaded yet."""
+    path = tmp_path / ".env"
+    path.write_text("MCP_SERVER_NAME=from-dotenv\n")
+    monkeypatch.setattr(env_file, "_ENV_PATH", path)
+    monkeypatch.setattr(env_file, "_dotenv_loaded", False)
+    yield path
+    # Values loaded from the file bypass monkeypatch, so remove them here
+    os.environ.pop("MCP_SERVER_NAME", None)
+
+
+class TestMCPServerConfig:
+
+    def test_from_env_is_cached(self, monkeypatch):
+        """Test that repeated from_env calls return the same instance."""
+        monkeypatch.setenv("MCP_SERVER_NAME", "cached-server")
+
+        first = MCPServerConfig.from_env()
+        monkeypatch.setenv("MCP_SERVER_NAME", "other-server")
+
+        assert MCPServerConfig.from_env() is first
+        assert first.name == "cached-server"
+
+    def test_reset_config_rebuilds(self, monkeypatch):
+        """Test that reset_config picks up environment changes."""
+        monkeypatch.setenv("MCP_SERVER_NAME", "before")
+        before = MCPServerConfig.from_env()
+
+        reset_config()
+        monkeypatch.setenv("MCP_SERVER_NAME", "after")
+
+        assert MCPServerConfig.from_env() is not before
+        assert MCPServerConfig.from_env().name == "after"
+
+    def test_environment_is_read_once_for_all_constructors(self, monkeypatch):
+        """Test that from_args and from_sources reuse the cached environment."""
+        monkeypatch.setenv("MCP_TCP_HOST", "10.0.0.1")
+        MCPServerConfig.from_env()
+        monkeypatch.setenv("MCP_TCP_HOST", "10.0.0.2")
+
+        assert MCPServerConfig.from_args({}).tcp_host == "10.0.0.1"
+        assert MCPServerConfig.from_sources({}).tcp_host == "10.0.0.1"
+
+        reset_config()
+        assert MCPServerConfig.from_sources({}).tcp_host == "10.0.0.2"
+
+    def test_from_args_does_not_mutate_cached_config(self, monkeypatch):
+        """Test that command line overrides leave the cached config untouched."""
+        monkeypatch.setenv("MCP_TRANSPORT_TYPE", "stdio")
+        env_config = MCPServerConfig.from_env()
+
+        config = MCPServerConfig.from_args({"name": "cli-server", "tcp": True})
+
+        assert config.name == "cli-server"
+        assert "tcp" in config.transport_types
+        assert env_config.name != "cli-server"
+        assert "tcp" not in env_config.transport_types
+
+    def test_api_keys_are_resolved_lazily(self, monkeypatch):
+        """Test that secrets are fetched in one batch on first access."""
+        batches = []
+
+        class FakeSecrets:
+            def get_many(self, keys, default=None):
+                batches.append(tuple(keys))
+                return {key: f"secret-{key}" for key in keys}
+
+        monkeypatch.setattr(
+            "mcp_server.config.settings.get_secrets_manager", lambda: FakeSecrets()
+        )
+
+        config = MCPServerConfig.from_env()
+        assert batches == []
+
+        assert config.openai_api_key == "secret-OPENAI_API_KEY"
+        assert config.qdrant_url == "secret-QDRANT_URL"
+        assert len(batches) == 1
+        assert "ANTHROPIC_API_KEY" in batches[0]
+
+    def test_from_args_overrides_api_keys(self):
+        """Test that command line API keys take precedence over secrets."""
+        config = MCPServerConfig.from_args(
+            {"claude_api_key": "cli-key", "qdrant_url": "http://cli-qdrant"}
+        )
+
+        assert config.anthropic_api_key == "cli-key"
+        assert config.qdrant_url == "http://cli-qdrant"
+
+    def test_constructor_accepts_api_keys(self):
+        """Test that API keys can still be passed to the constructor."""
+        config = MCPServerConfig(anthropic_api_key="direct-key", qdrant_url="http://qdrant")
+
+        assert config.anthropic_api_key == "direct-key"
+        assert config.qdrant_url == "http://qdrant"
+
+    def test_explicit_api_keys_affect_equality(self):
+        """Test that configs differing only in explicit API keys are not equal."""
+        first = MCPServerConfig(anthropic_api_key="a")
+        second = MCPServerConfig(anthropic_api_key="b")
+
+        assert first != second
+        assert first == MCPServerConfig(anthropic_api_key="a")
+        assert hash(first) == hash(MCPServerConfig(anthropic_api_key="a"))
+
+    def test_config_is_immutable(self):
+        """Test that a built configuration cannot be modified in place."""
+        config = MCPServerConfig.from_env()
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            config.name = "changed"
+
+    def test_from_sources_layers_values_over_environment(self, monkeypatch):
+        """Test that explicit values win over the environment, then defaults."""
+        monkeypatch.setenv("MCP_TCP_HOST", "0.0.0.0")
+        monkeypatch.setenv("MCP_TCP_PORT", "9100")
+
+        config = MCPServerConfig.from_sources({"tcp_port": 9200, "name": None})
+
+        assert config.tcp_port == 9200
+        assert config.tcp_host == "0.0.0.0"
+        assert config.name == "ai-mcp-server"
+
+    def test_malformed_numbers_keep_defaults(self, monkeypatch):
+        """Test that unparsable numeric settings fall back to the defaults."""
+        monkeypatch.setenv("MCP_TCP_PORT", "not-a-port")
+        monkeypatch.setenv("CLAUDE_DEFAULT_MAX_TOKENS", "+-5")
+        monkeypatch.setenv("CLAUDE_DEFAULT_TEMPERATURE", "warm")
+        monkeypatch.setenv("OPENAI_DEFAULT_MAX_TOKENS", " 2048 ")
+
+        config = MCPServerConfig.from_env()
+
+        assert config.tcp_port == 9000
+        assert config.claude_default_max_tokens == 4096
+        assert config.claude_default_temperature == 0.7
+        assert config.openai_default_max_tokens == 2048
+
+    def test_numbers_accept_underscore_separators(self, monkeypatch):
+        """Test that integer settings accept everything int() does."""
+        monkeypatch.setenv("CLAUDE_DEFAULT_MAX_TOKENS", "8_192")
+
+        assert MCPServerConfig.from_env().claude_default_max_tokens == 8192
+
+    def test_comma_separated_values_drop_empty_items(self, monkeypatch):
+        """Test that trailing commas and blanks are ignored in list settings."""
+        monkeypatch.setenv("MCP_TRANSPORT_TYPE", "stdio, tcp,")
+        monkeypatch.setenv("MCP_WS_ORIGINS", " , ")
+
+        config = MCPServerConfig.from_env()
+
+        assert config.transport_types == ("stdio", "tcp")
+        assert config.ws_origins is None
+
+    def test_out_of_range_values_keep_defaults(self, monkeypatch):
+        """Test that values failing validation fall back to the defaults."""
+        monkeypatch.setenv("MCP_WS_PORT", "70000")
+        monkeypatch.setenv("OPENAI_DEFAULT_MAX_TOKENS", "0")
+        monkeypatch.setenv("OPENAI_DEFAULT_TEMPERATURE", "-1")
+
+        config = MCPServerConfig.from_env()
+
+        assert config.ws_port == 8765
+        assert config.openai_default_max_tokens == 1024
+        assert config.openai_default_temperature == 0.7
+
+    def test_single_string_sequence_is_not_split(self):
+        """Test that a lone string in a sequence setting is kept whole."""
+        config = MCPServerConfig(transport_types="tcp", claude_models=["model-a"])
+
+        assert config.transport_types == ("tcp",)
+        assert config.claude_models == ("model-a",)
+
+    def test_ws_origins_are_stored_as_tuple(self):
+        """Test that ws_origins is normalised like the other sequences."""
+        config = MCPServerConfig(ws_origins=["http://a", "http://b"])
+        assert config.ws_origins == ("http://a", "http://b")
+        hash(config)
+
+        assert MCPServerConfig(ws_origins="http://a").ws_origins == ("http://a",)
+        assert MCPServerConfig().ws_origins is None
+
+    def test_from_sources_accepts_api_keys(self):
+        """Test that from_sources passes API keys through as overrides."""
+        config = MCPServerConfig.from_sources({"anthropic_api_key": "explicit-key"})
+
+        assert config.anthropic_api_key == "explicit-key"
+
+    def test_from_sources_rejects_unknown_keys(self):
+        """Test that misspelled keys are reported instead of ignored."""
+        with pytest.raises(TypeError, match="nmae"):
+            MCPServerConfig.from_sources({"nmae": "typo"})
+
+    def test_explicit_values_are_validated(self):
+        """Test that invalid command line and explicit values are rejected."""
+        with pytest.raises(ValueError, match="tcp_port"):
+            MCPServerConfig.from_args({"port": 70000})
+
+        with pytest.raises(ValueError, match="claude_default_temperature"):
+            MCPServerConfig.from_sources({"claude_default_temperature": -0.5})
+
+        config = MCPServerConfig.from_sources({"ws_port": "8800"})
+        assert config.ws_port == 8800
+
+    def test_non_text_sequence_values_are_rejected(self):
+        """Test that sequence settings must be text, not arbitrary objects."""
+        with pytest.raises(ValueError, match="transport_types"):
+            MCPServerConfig.from_sources({"transport_types": 5})
+
+        with pytest.raises(ValueError, match="ws_origins"):
+            MCPServerConfig.from_sources({"ws_origins": [1]})
+
+
+class TestLoadEnvFile:
+
+    def test_loads_values_from_file(self, dotenv_file):
+        """Test that the .env file populates the environment."""
+        load_env_file()
+
+        assert os.environ["MCP_SERVER_NAME"] == "from-dotenv"
+
+    def test_skipped_when_requested(self, dotenv_file, monkeypatch):
+        """Test that MCP_SKIP_DOTENV prevents the file from being read."""
+        monkeypatch.setenv("MCP_SKIP_DOTENV", "1")
+
+        load_env_file()
+
+        assert "MCP_SERVER_NAME" not in os.environ
+
+    def test_missing_file_is_ignored(self, dotenv_file, monkeypatch):
+        """Test that a missing .env file short-circuits without parsing."""
+        dotenv_file.unlink()
+        monkeypatch.setattr("dotenv.load_dotenv", lambda *a, **kw: pytest.fail("parsed"))
+
+        load_env_file()
+
+    def test_existing_environment_wins(self, dotenv_file, monkeypatch):
+        """Test that the file never overrides variables already set."""
+        monkeypatch.setenv("MCP_SERVER_NAME", "from-env")
+
+        load_env_file()
+
+        assert os.environ["MCP_SERVER_NAME"] == "from-env"
+
+    def test_loaded_only_once(self, dotenv_file, monkeypatch):
+        """Test that later calls do not read the file again."""
+        load_env_file()
+        monkeypatch.delenv("MCP_SERVER_NAME")
+
+        load_env_file()
+
+        assert "MCP_SERVER_NAME" not in os.environ